@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""Tableau de bord Streamlit de capacité réseau (VLANs et adresses IP).
+
+Charge le dernier export CapaVLAN*.csv et les fichiers subnet_vlanXX.csv
+du dossier de données, puis propose trois pages: vue globale, détail des
+VLANs et détail des adresses IP.
+
+Lancement:
+    streamlit run vlan_dashboard.py
+"""
+
+import functools
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import altair as alt
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+DOSSIER_DONNEES = Path("data")
+
+st.set_page_config(
+    page_title="Capacité Réseau",
+    page_icon="🌐",
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+
+CSS_GLOBAL = """
+<style>
+    .main .block-container { padding-top: 2rem; }
+    [data-testid="metric-container"] {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        border-radius: 0.75rem;
+        padding: 1rem;
+        color: white;
+    }
+</style>
+"""
+
+
+def _lister_csv(dossier: Path) -> list:
+    """Entrées CSV du dossier en une seule passe ``os.scandir``.
+
+    ``DirEntry.stat()`` est mis en cache par le système: le même résultat
+    sert à la signature de cache et au choix du fichier le plus récent,
+    sans un syscall stat() par fichier et par usage.
+    """
+    try:
+        with os.scandir(dossier) as it:
+            return [e for e in it if e.name.endswith(".csv")]
+    except FileNotFoundError:
+        return []
+
+
+def _signature_fichiers(dossier: Path) -> tuple:
+    """Signature (chemin, mtime, taille) de chaque CSV du dossier.
+
+    Sert de clé de cache à ``charger_donnees``: dès qu'un fichier change,
+    la signature change et Streamlit invalide l'entrée en cache.
+    """
+    return tuple(sorted(
+        (e.path, e.stat().st_mtime_ns, e.stat().st_size)
+        for e in _lister_csv(dossier)
+    ))
+
+
+# Seules colonnes réellement consommées par le tableau de bord; le reste
+# des exports n'est ni parsé ni gardé en mémoire.
+_COLONNES_VLAN = {
+    "Vlan Id", "Name", "Zone", "Subnet Ip Used Size",
+    "Subnet Ip free size", "Subnet Size", "Used percent",
+}
+_COLONNES_IP = {"IpAddress", "IpName"}
+
+
+def _lire_csv(fichier, colonnes=None) -> pd.DataFrame:
+    """Lit un CSV avec le parseur pyarrow (multi-thread), sinon le C engine.
+
+    ``colonnes`` restreint la lecture aux colonnes utiles; l'en-tête est
+    reniflé d'abord pour tolérer les espaces parasites dans les noms.
+    """
+    usecols = None
+    if colonnes:
+        entete = pd.read_csv(fichier, nrows=0)
+        usecols = [c for c in entete.columns if c.strip() in colonnes]
+        if not usecols:
+            usecols = None
+    try:
+        return pd.read_csv(fichier, engine="pyarrow", usecols=usecols)
+    except (ImportError, ValueError):
+        return pd.read_csv(fichier, usecols=usecols)
+
+
+def _reduire_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Rétrécit les colonnes numériques pour halver mémoire et bande passante.
+
+    Les exports tiennent largement dans des entiers non signés et des
+    float32; toutes les sommes/moyennes et la sérialisation Arrow en
+    profitent d'autant.
+    """
+    for colonne in df.select_dtypes("int64").columns:
+        df[colonne] = pd.to_numeric(df[colonne], downcast="unsigned")
+    for colonne in df.select_dtypes("float64").columns:
+        df[colonne] = df[colonne].astype("float32")
+    return df
+
+
+@st.cache_data
+def charger_donnees(dossier_donnees: str, signature: tuple):
+    """Charge le dernier export VLAN et les fichiers IP par VLAN.
+
+    ``signature`` n'est pas lue dans le corps: elle ne sert qu'à
+    invalider le cache quand un CSV du dossier change.
+    """
+    entrees = _lister_csv(Path(dossier_donnees))
+
+    fichier_vlan = max(
+        (e for e in entrees if e.name.startswith("CapaVLAN")),
+        key=lambda e: e.stat().st_mtime,
+        default=None,
+    )
+    if fichier_vlan is None:
+        return None, {}
+    df_vlan = _lire_csv(fichier_vlan.path, _COLONNES_VLAN)
+    df_vlan.columns = df_vlan.columns.str.strip()
+    # Colonnes de recherche précalculées: la recherche se fait ensuite en
+    # littéral (regex=False) sans refaire astype(str) + lower() à chaque
+    # frappe dans le filtre.
+    if "Name" in df_vlan.columns:
+        df_vlan["_name_lc"] = df_vlan["Name"].astype("string").str.lower()
+    if "Vlan Id" in df_vlan.columns:
+        df_vlan["_vid_s"] = df_vlan["Vlan Id"].astype("string")
+    # Classification de zone figée au chargement: une seule passe
+    # vectorisée en majuscules au lieu de quatre compréhensions Python
+    # par rerun.
+    if "Zone" in df_vlan.columns:
+        zones_maj = df_vlan["Zone"].astype("string").str.upper()
+        genre = np.where(
+            zones_maj.str.contains("HORS|PREPROD|DEV|TEST", regex=True,
+                                   na=False),
+            "HORS",
+            np.where(
+                zones_maj.str.contains("PROD", regex=False, na=False),
+                "PROD",
+                "OTHER",
+            ),
+        )
+        df_vlan["_zone_kind"] = pd.Categorical(
+            genre, categories=["PROD", "HORS", "OTHER"]
+        )
+        df_vlan["Zone"] = df_vlan["Zone"].astype("category")
+    df_vlan = _reduire_dtypes(df_vlan)
+
+    travaux = []
+    for entree in sorted(
+        (e for e in entrees if e.name.startswith("subnet_vlan")),
+        key=lambda e: e.name,
+    ):
+        m = re.search(r"(\d+)", entree.name)
+        if m:
+            travaux.append((int(m.group(1)), entree.path))
+
+    def _charger_ip(vlan_id, fichier):
+        df_ip = _lire_csv(fichier, _COLONNES_IP)
+        df_ip.columns = df_ip.columns.str.strip()
+        df_ip["VLAN ID"] = np.int32(vlan_id)
+        if "IpAddress" in df_ip.columns:
+            df_ip["_ip_lc"] = df_ip["IpAddress"].astype("string").str.lower()
+        if "IpName" in df_ip.columns:
+            df_ip["_ipname_lc"] = df_ip["IpName"].astype("string").str.lower()
+        return vlan_id, _reduire_dtypes(df_ip)
+
+    # Lectures en parallèle: le parseur CSV relâche le GIL, les fichiers
+    # par VLAN se chargent donc au rythme du disque et non un par un.
+    fichiers_ip = {}
+    if travaux:
+        with ThreadPoolExecutor(max_workers=min(32, len(travaux))) as pool:
+            for vlan_id, df_ip in pool.map(
+                lambda travail: _charger_ip(*travail), travaux
+            ):
+                fichiers_ip[vlan_id] = df_ip
+
+    return df_vlan, fichiers_ip
+
+
+@st.cache_data
+def _concat_ips(signature: tuple, _fichiers_ip: dict,
+                _df_vlan: pd.DataFrame) -> pd.DataFrame:
+    """Concatène les fichiers IP une seule fois par signature de données.
+
+    Les paramètres préfixés d'un underscore ne sont pas hachés par
+    Streamlit: la signature des fichiers suffit comme clé.
+    """
+    df = pd.concat(_fichiers_ip.values(), ignore_index=True, copy=False)
+    # Zone jointe une fois pour toutes: le filtre de zone devient une
+    # simple égalité sur les codes catégoriels au lieu d'un isin sur une
+    # liste reconstruite à chaque frappe.
+    if "Vlan Id" in _df_vlan.columns and "Zone" in _df_vlan.columns:
+        vlan_to_zone = dict(zip(_df_vlan["Vlan Id"].to_numpy(),
+                                _df_vlan["Zone"].to_numpy()))
+        df["_zone"] = pd.Categorical(df["VLAN ID"].map(vlan_to_zone))
+    # Colonnes répétitives en catégorielles: Arrow n'envoie alors au
+    # navigateur que le dictionnaire de valeurs plus des codes entiers.
+    for colonne in ("Zone", "VLAN ID"):
+        if colonne in df.columns:
+            df[colonne] = df[colonne].astype("category")
+    return df
+
+
+@functools.lru_cache(maxsize=32)
+def _index_colonnes(colonnes: tuple) -> dict:
+    """Index nom minuscule -> nom d'origine, construit une fois par frame.
+
+    Streamlit relance tout le script à chaque interaction; sans ce cache,
+    chaque appel à ``obtenir_colonne`` repasserait ``.lower()`` sur
+    toutes les colonnes.
+    """
+    return {c.lower(): c for c in colonnes}
+
+
+def obtenir_colonne(df, mots_cles):
+    """Retourne la première colonne dont le nom contient un des mots-clés."""
+    index = _index_colonnes(tuple(df.columns))
+    for mot in mots_cles:
+        mot_lc = mot.lower()
+        for nom_lc, nom in index.items():
+            if mot_lc in nom_lc:
+                return nom
+    return None
+
+
+def style_vlans(df):
+    """Styles du tableau VLAN selon l'utilisation, en une passe numpy.
+
+    Appelé avec ``Styler.apply(..., axis=None)``: un seul appel Python
+    pour tout le tableau au lieu d'un par ligne.
+    """
+    css = np.full(df.shape, "", dtype=object)
+    col_percent = obtenir_colonne(df, ["Used percent", "percent"])
+    if col_percent is not None:
+        valeurs = df[col_percent].to_numpy()
+        couleurs = np.select(
+            [valeurs > 90, valeurs > 80, valeurs > 70, valeurs < 30],
+            [
+                "background-color: #fee2e2",
+                "background-color: #fef3c7",
+                "background-color: #fff7ed",
+                "background-color: #dcfce7",
+            ],
+            "",
+        )
+        css[:, :] = couleurs[:, None]
+    return pd.DataFrame(css, index=df.index, columns=df.columns)
+
+
+@st.cache_data(ttl=600)
+def _fig_zone_utilisation(par_zone: pd.DataFrame):
+    """Combo barres/ligne d'utilisation par zone, mis en cache."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=par_zone["Zone"],
+        y=par_zone["nb"],
+        name="Nombre de VLANs",
+        marker_color="#667eea",
+    ))
+    fig.add_trace(go.Scatter(
+        x=par_zone["Zone"],
+        y=par_zone["pct"],
+        name="Utilisation moyenne (%)",
+        yaxis="y2",
+        mode="lines+markers",
+        marker_color="#f59e0b",
+    ))
+    fig.update_layout(
+        height=400,
+        yaxis2={"overlaying": "y", "side": "right"},
+    )
+    return fig
+
+
+@st.fragment
+def page_vue_globale(df_vlan, fichiers_ip):
+    """Page d'accueil: métriques globales, top VLANs et répartition par zone."""
+    st.header("🌍 Vue globale")
+
+    col_used = obtenir_colonne(df_vlan, ["Used Size", "used"])
+    col_free = obtenir_colonne(df_vlan, ["free size", "free"])
+    col_percent = obtenir_colonne(df_vlan, ["Used percent", "percent"])
+
+    # Une seule passe groupby par zone alimente les cartes de métriques
+    # ET le graphique d'utilisation plus bas, au lieu d'un groupby par
+    # consommateur.
+    aggregations = {
+        "nb": ("Vlan Id", "size"),
+        "kind": ("_zone_kind", "first"),
+    }
+    if col_used:
+        aggregations["utilise"] = (col_used, "sum")
+    if col_free:
+        aggregations["libre"] = (col_free, "sum")
+    if col_percent:
+        aggregations["pct"] = (col_percent, "mean")
+    par_zone = (
+        df_vlan.groupby("Zone", observed=True)
+        .agg(**aggregations)
+        .reset_index()
+    )
+
+    total_utilise = int(par_zone["utilise"].sum()) if col_used else 0
+    total_libre = int(par_zone["libre"].sum()) if col_free else 0
+    nb_prod = int(par_zone.loc[par_zone["kind"] == "PROD", "nb"].sum())
+    nb_hors_prod = int(par_zone.loc[par_zone["kind"] == "HORS", "nb"].sum())
+
+    # st.metric natif: le style dégradé vient du CSS global sur
+    # metric-container, plus de cartes HTML reformatées à chaque rerun.
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("🌐 Total VLANs", len(df_vlan))
+    col2.metric("📍 IPs utilisées", f"{total_utilise:,}")
+    col3.metric("🟢 IPs libres", f"{total_libre:,}")
+    col4.metric("🏭 VLANs PROD", nb_prod)
+    col5.metric("🧪 VLANs Hors PROD", nb_hors_prod)
+
+    st.divider()
+
+    col_gauche, col_droite = st.columns(2)
+    with col_gauche:
+        st.subheader("🔝 Top 15 des VLANs les plus utilisés")
+        if col_percent:
+            # Top-k par argpartition: O(N) au lieu du tri partiel de
+            # nlargest, sans passer par l'indexation pandas.
+            valeurs = df_vlan[col_percent].to_numpy()
+            k = min(15, valeurs.size)
+            if k:
+                top_idx = np.argpartition(-valeurs, k - 1)[:k]
+                top_idx = top_idx[np.argsort(-valeurs[top_idx])]
+                top_vlans = df_vlan.iloc[top_idx][["Vlan Id", col_percent]]
+                # Rendu vega-lite natif: spécification minuscule côté
+                # navigateur, plus de figure plotly à reconstruire et
+                # sérialiser en JSON à chaque rerun.
+                st.bar_chart(
+                    top_vlans.set_index("Vlan Id")[col_percent],
+                    height=400,
+                )
+
+    with col_droite:
+        st.subheader("🗂️ Répartition par zone")
+        zone_counts = df_vlan["Zone"].value_counts()
+        st.altair_chart(
+            alt.Chart(zone_counts.reset_index())
+            .mark_arc(innerRadius=80)
+            .encode(theta="count", color="Zone"),
+            use_container_width=True,
+        )
+
+    st.subheader("📊 Utilisation par zone")
+    if col_percent:
+        st.plotly_chart(
+            _fig_zone_utilisation(par_zone),
+            use_container_width=True,
+        )
+
+
+@st.fragment
+def page_vlans(df_vlan):
+    """Page de détail des VLANs avec filtres, tableau stylé et export."""
+    st.header("🗃️ Détail des VLANs")
+
+    col_percent = obtenir_colonne(df_vlan, ["Used percent", "percent"])
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        recherche = st.text_input("🔍 Recherche (nom ou ID)", "")
+    with col2:
+        zones = ["Toutes"] + sorted(
+            df_vlan["Zone"].dropna().unique().tolist()
+        )
+        zone_filtre = st.selectbox("Zone", zones)
+    with col3:
+        utilisation_min = st.slider("Utilisation minimale (%)", 0, 100, 0)
+
+    # Masque booléen combiné puis une seule découpe: chaque filtrage
+    # intermédiaire allouait sinon un DataFrame complet par frappe.
+    masque = np.ones(len(df_vlan), dtype=bool)
+    if recherche:
+        requete = recherche.lower()
+        masque &= (
+            df_vlan["_name_lc"].str.contains(
+                requete, regex=False, na=False).to_numpy()
+            | df_vlan["_vid_s"].str.contains(
+                requete, regex=False, na=False).to_numpy()
+        )
+    if zone_filtre != "Toutes":
+        masque &= (df_vlan["Zone"] == zone_filtre).to_numpy()
+    if col_percent and utilisation_min > 0:
+        masque &= df_vlan[col_percent].to_numpy() >= utilisation_min
+    df_filtre = df_vlan[masque]
+
+    st.caption(f"{len(df_filtre)} VLAN(s) affiché(s)")
+    styled_df = df_filtre.style.apply(style_vlans, axis=None)
+    st.dataframe(
+        styled_df,
+        column_config={"_name_lc": None, "_vid_s": None, "_zone_kind": None},
+        use_container_width=True,
+        height=600,
+    )
+
+    def _csv_filtre():
+        # Appelé par Streamlit au moment du clic seulement: plus de
+        # sérialisation CSV à chaque frappe dans les filtres.
+        colonnes = [c for c in df_filtre.columns if not c.startswith("_")]
+        return df_filtre[colonnes].to_csv(index=False).encode("utf-8-sig")
+
+    st.download_button(
+        "⬇️ Exporter en CSV",
+        data=_csv_filtre,
+        file_name="vlans_filtres.csv",
+        mime="text/csv",
+    )
+
+
+@st.fragment
+def page_adresses_ip(df_vlan, fichiers_ip, signature):
+    """Page de détail des adresses IP de tous les VLANs."""
+    st.header("📍 Adresses IP")
+
+    if not fichiers_ip:
+        st.warning("Aucun fichier subnet_vlanXX.csv trouvé.")
+        return
+
+    # Concat mis en cache: chaque frappe dans un filtre relance la page,
+    # inutile de re-concaténer tous les fichiers à chaque fois.
+    df_all_ips = _concat_ips(signature, fichiers_ip, df_vlan)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        vlans = ["Tous"] + sorted(fichiers_ip.keys())
+        vlan_filtre = st.selectbox("VLAN", vlans)
+    with col2:
+        zones = ["Toutes"] + sorted(
+            df_vlan["Zone"].dropna().unique().tolist()
+        )
+        zone_filtre_ip = st.selectbox("Zone", zones, key="zone_ip")
+    with col3:
+        recherche_ip = st.text_input("🔍 Recherche (IP ou nom)", "")
+
+    # Même principe que sur la page VLANs: un seul masque, une seule
+    # découpe, quelle que soit la combinaison de filtres actifs.
+    masque = np.ones(len(df_all_ips), dtype=bool)
+    if vlan_filtre != "Tous":
+        masque &= (df_all_ips["VLAN ID"] == vlan_filtre).to_numpy()
+    if zone_filtre_ip != "Toutes":
+        masque &= (df_all_ips["_zone"] == zone_filtre_ip).to_numpy()
+    if recherche_ip:
+        requete = recherche_ip.lower()
+        masque &= (
+            df_all_ips["_ip_lc"].str.contains(
+                requete, regex=False, na=False).to_numpy()
+            | df_all_ips["_ipname_lc"].str.contains(
+                requete, regex=False, na=False).to_numpy()
+        )
+    df_ip_filtre = df_all_ips[masque]
+
+    st.caption(f"{len(df_ip_filtre)} adresse(s) affichée(s)")
+    # Pas de Styler ici: le rendu natif évite de sérialiser une CSS par
+    # cellule à chaque rerun sur un tableau qui peut être très grand.
+    st.dataframe(
+        df_ip_filtre,
+        column_config={
+            "VLAN ID": st.column_config.NumberColumn(format="%d"),
+            "_ip_lc": None,
+            "_ipname_lc": None,
+            "_zone": None,
+        },
+        use_container_width=True,
+        height=600,
+    )
+
+    st.subheader("📊 Adresses par VLAN")
+    # bincount sur les codes catégoriels + argpartition: compte et top-20
+    # en deux passes numpy, sans le MultiIndex de value_counts.
+    categories = df_ip_filtre["VLAN ID"].cat.categories
+    codes = df_ip_filtre["VLAN ID"].cat.codes.to_numpy()
+    comptes = np.bincount(codes[codes >= 0], minlength=len(categories))
+    k = min(20, int(np.count_nonzero(comptes)))
+    if k:
+        top_idx = np.argpartition(-comptes, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-comptes[top_idx])]
+        st.bar_chart(
+            pd.Series(comptes[top_idx],
+                      index=categories[top_idx].astype(str),
+                      name="Adresses"),
+            height=350,
+        )
+
+    def _csv_ip_filtre():
+        colonnes = [
+            c for c in df_ip_filtre.columns if not c.startswith("_")
+        ]
+        return df_ip_filtre[colonnes].to_csv(index=False).encode("utf-8-sig")
+
+    st.download_button(
+        "⬇️ Exporter en CSV",
+        data=_csv_ip_filtre,
+        file_name="adresses_ip_filtrees.csv",
+        mime="text/csv",
+    )
+
+
+def main():
+    # Toujours réémis: les éléments d'un rerun complet sont remontés de
+    # zéro, donc un CSS conditionné à session_state disparaîtrait dès la
+    # première interaction hors fragment (changement de page).
+    st.markdown(CSS_GLOBAL, unsafe_allow_html=True)
+
+    st.sidebar.title("🌐 Capacité Réseau")
+    page = st.sidebar.radio(
+        "Navigation",
+        ["Vue globale", "VLANs", "Adresses IP"],
+    )
+
+    signature = _signature_fichiers(DOSSIER_DONNEES)
+    df_vlan, fichiers_ip = charger_donnees(str(DOSSIER_DONNEES), signature)
+    if df_vlan is None:
+        st.error(
+            f"Aucun fichier CapaVLAN*.csv trouvé dans {DOSSIER_DONNEES}/"
+        )
+        return
+
+    if page == "Vue globale":
+        page_vue_globale(df_vlan, fichiers_ip)
+    elif page == "VLANs":
+        page_vlans(df_vlan)
+    else:
+        page_adresses_ip(df_vlan, fichiers_ip, signature)
+
+
+main()
@@ -0,0 +1,916 @@
+#!/usr/bin/env python3
+"""Décommissionnement en masse de VMs via l'API PSSIT.
+
+Lit un CSV de VMs à décommissionner (vm_name, subscription_id, vcenter,
+environment), annule les souscriptions correspondantes côté PSSIT en
+parallèle, puis produit un rapport texte et un CSV de résultats.
+
+Usage:
+    python vm_decommissioner.py vms.csv --url https://pssit.example.com \
+        --username svc_decom --workers 10 --report rapport.txt
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import ssl
+import getpass
+import importlib.util
+import logging
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait as futures_wait,
+)
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from functools import partial
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    import requests
+
+# Les piles réseau (requests, urllib3, aiohttp, httpx) sont importées
+# paresseusement: --help, la collecte de tests et le dry-run n'en paient
+# pas le coût de démarrage.
+aiohttp = None
+httpx = None
+
+
+def _charger_backends_async() -> None:
+    """Charge les backends asynchrones optionnels à la demande."""
+    global aiohttp, httpx
+    if httpx is None and importlib.util.find_spec("h2") is not None:
+        # httpx n'est retenu que si h2 est installé: AsyncClient(http2=True)
+        # lève ImportError sans lui, et sans HTTP/2 il n'apporte rien
+        # face à aiohttp.
+        try:
+            import httpx as _httpx
+            httpx = _httpx
+        except ImportError:
+            pass
+    if aiohttp is None:
+        try:
+            import aiohttp as _aiohttp
+            aiohttp = _aiohttp
+        except ImportError:
+            pass
+
+# Encodeur/décodeur JSON le plus rapide disponible; les réponses de
+# cancel peuvent embarquer de gros arbres de ressources.
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+
+        def _json_dumps(obj: Any) -> bytes:
+            return ujson.dumps(obj).encode("utf-8")
+
+        _json_loads = ujson.loads
+    except ImportError:
+        def _json_dumps(obj: Any) -> bytes:
+            return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+        _json_loads = json.loads
+
+logger = logging.getLogger("vm_decommissioner")
+
+# Contexte TLS partagé: construit une seule fois, il mutualise le cache
+# de tickets de session (reprise TLS 1.3) entre toutes les connexions.
+_SSL_CTX = ssl.create_default_context()
+
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 1.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Nombre d'échecs récents repris dans l'aperçu console du rapport.
+_APERCU_ECHECS = 20
+
+
+class DecommissionStatus(Enum):
+    """États possibles d'une demande de décommissionnement."""
+
+    PENDING = "en_attente"
+    IN_PROGRESS = "en_cours"
+    SUCCESS = "succes"
+    FAILED = "echec"
+    SKIPPED = "ignore"
+
+
+@dataclass(slots=True)
+class VMDecommissionRequest:
+    """Demande de décommissionnement issue d'une ligne du CSV."""
+
+    vm_name: str
+    subscription_id: str
+    vcenter: str
+    environment: str
+    status: DecommissionStatus = DecommissionStatus.PENDING
+    error_message: Optional[str] = None
+    # Horodatages monotones (time.monotonic), pas des datetime: seuls
+    # les écarts comptent, et l'horloge murale peut sauter en cours de lot.
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+
+
+@dataclass(slots=True)
+class DecommissionResult:
+    """Résultat d'un décommissionnement individuel."""
+
+    vm_name: str
+    subscription_id: str
+    status: DecommissionStatus
+    duration: float = 0.0
+    error_message: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+
+
+class PSSITClient:
+    """Client REST pour l'API PSSIT (authentification et souscriptions)."""
+
+    def __init__(self, base_url: str, username: str, password: str,
+                 verify_ssl: bool = True, timeout: int = 30,
+                 pool_size: int = 10):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.verify_ssl = verify_ssl
+        self.timeout = timeout
+        self.token: Optional[str] = None
+        self._prepared_headers: Dict[str, str] = {}
+        # Premier 401 rencontré: court-circuite les cancels restants au
+        # lieu de laisser N workers brûler chacun le cycle de retries.
+        self._auth_invalide = threading.Event()
+        self._reauth_lock = threading.Lock()
+        self._reauth_tentee = False
+        self.session = self._create_session(pool_size)
+
+    def _create_session(self, pool_size: int) -> "requests.Session":
+        """Session requests avec retry 5xx/429 et pool dimensionné.
+
+        urllib3 ne garde que 10 sockets par hôte par défaut; avec plus de
+        workers, chaque appel au-delà rouvre une connexion TCP+TLS. Le
+        pool est donc aligné sur le nombre de workers pour qu'un socket
+        keep-alive chaud soit disponible par cancel concurrent.
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        verify_ssl = self.verify_ssl
+
+        class _AdaptateurTLSPartage(HTTPAdapter):
+            """HTTPAdapter branché sur le contexte TLS du module.
+
+            Sans cela, chaque nouveau pool urllib3 recrée un SSLContext
+            et relit le bundle CA depuis le disque.
+            """
+
+            def init_poolmanager(self, *args, **kwargs):
+                if verify_ssl:
+                    kwargs.setdefault("ssl_context", _SSL_CTX)
+                return super().init_poolmanager(*args, **kwargs)
+
+        session = requests.Session()
+        session.verify = self.verify_ssl
+        session.headers["Connection"] = "keep-alive"
+        session.headers["Content-Type"] = "application/json"
+        retry_strategy = Retry(
+            total=RETRY_TOTAL,
+            backoff_factor=RETRY_BACKOFF,
+            status_forcelist=list(RETRY_STATUSES),
+            allowed_methods=["GET", "POST", "DELETE"],
+        )
+        adapter = _AdaptateurTLSPartage(
+            max_retries=retry_strategy,
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            pool_block=False,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def authenticate(self) -> bool:
+        """Récupère un jeton d'API et l'installe sur la session."""
+        import requests
+
+        try:
+            with self.session.post(
+                f"{self.base_url}/api/auth/token",
+                data=_json_dumps(
+                    {"username": self.username, "password": self.password}
+                ),
+                timeout=self.timeout,
+            ) as response:
+                response.raise_for_status()
+                corps = response.content
+        except requests.exceptions.RequestException as e:
+            logger.error("Échec de l'authentification PSSIT: %s", e)
+            return False
+        self.token = _json_loads(corps).get("token")
+        if not self.token:
+            logger.error("Réponse d'authentification sans jeton")
+            return False
+        # Reconstruction plutôt que .update(): les en-têtes peuvent déjà
+        # être gelés si on ré-authentifie après un 401 en cours de lot.
+        en_tetes = dict(self.session.headers)
+        en_tetes["Authorization"] = f"Bearer {self.token}"
+        self.session.headers = en_tetes
+        # Pré-chauffe: un GET authentifié met le ticket de session TLS en
+        # cache avant que decommission_batch ne déploie les workers.
+        try:
+            with self.session.get(
+                f"{self.base_url}/api/auth/me", timeout=self.timeout
+            ):
+                pass
+        except requests.exceptions.RequestException:
+            pass
+        # requests.Session n'est thread-safe que pour des requêtes
+        # indépendantes, pas pour la mutation des en-têtes: une fois le
+        # jeton posé, les en-têtes sont gelés pour tout le fan-out.
+        self.session.headers = MappingProxyType(dict(self.session.headers))
+        # Jeu d'en-têtes figé réutilisé par les requêtes préparées du
+        # chemin chaud, pour court-circuiter la fusion des en-têtes de
+        # session à chaque appel.
+        self._prepared_headers = dict(self.session.headers)
+        logger.info("Authentifié auprès de PSSIT")
+        return True
+
+    def _gerer_401(self) -> bool:
+        """Réagit à un 401: une seule ré-authentification pour tout le lot.
+
+        Retourne True si le jeton a été renouvelé (l'appelant peut
+        retenter); sinon l'évènement d'invalidation est levé et tous les
+        cancels restants échouent immédiatement sans toucher le réseau.
+        """
+        with self._reauth_lock:
+            if self._auth_invalide.is_set():
+                return False
+            if not self._reauth_tentee:
+                self._reauth_tentee = True
+                if self.authenticate():
+                    return True
+                self._auth_invalide.set()
+                return False
+            # Un autre worker a déjà renouvelé le jeton.
+            return True
+
+    def decommission_subscription(
+        self, subscription_id: str, _retente: bool = False
+    ) -> Tuple[bool, Optional[str], Dict[str, Any]]:
+        """Annule une souscription. Retourne (succès, erreur, détails)."""
+        import requests
+
+        assert self.token, "authenticate() doit être appelé avant le lot"
+        if self._auth_invalide.is_set():
+            return False, "jeton invalide: cancel court-circuité", {}
+        url = f"{self.base_url}/api/subscriptions/{subscription_id}/cancel"
+        try:
+            # Requête préparée avec les en-têtes figés + session.send:
+            # évite la fusion session/requête et la re-canonicalisation
+            # des en-têtes que session.post refait à chaque appel.
+            prepared = requests.Request(
+                "POST", url, headers=self._prepared_headers
+            ).prepare()
+            # Le bloc with rend la connexion au pool dès la sortie au
+            # lieu d'attendre le passage du GC sur la réponse.
+            with self.session.send(
+                prepared, timeout=self.timeout, verify=self.verify_ssl,
+                stream=False,
+            ) as response:
+                response.raise_for_status()
+                return True, None, _json_loads(response.content)
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 401:
+                if not _retente and self._gerer_401():
+                    return self.decommission_subscription(
+                        subscription_id, _retente=True
+                    )
+                self._auth_invalide.set()
+                return False, "HTTP 401: jeton invalide", {}
+            # 512 octets suffisent pour diagnostiquer; .text redécoderait
+            # (détection d'encodage comprise) tout le corps d'erreur.
+            error_msg = (
+                f"HTTP {e.response.status_code}: "
+                f"{e.response.content[:512].decode('utf-8', 'replace')}"
+            )
+            return False, error_msg, {}
+        except requests.exceptions.RequestException as e:
+            return False, str(e), {}
+
+    def check_subscription_status(
+        self, subscription_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """Retourne l'état courant d'une souscription, ou None en erreur."""
+        import requests
+
+        url = f"{self.base_url}/api/subscriptions/{subscription_id}"
+        try:
+            with self.session.get(url, timeout=self.timeout) as response:
+                response.raise_for_status()
+                return _json_loads(response.content)
+        except requests.exceptions.RequestException as e:
+            logger.warning(
+                "État de %s indisponible: %s", subscription_id, e
+            )
+            return None
+
+    async def decommission_subscription_async(
+        self, session, subscription_id: str
+    ) -> Tuple[bool, Optional[str], Dict[str, Any]]:
+        """Variante asynchrone de :meth:`decommission_subscription`.
+
+        Reproduit la stratégie de retry de la session requests
+        (3 tentatives, backoff exponentiel, statuts 429/5xx).
+        """
+        if self._auth_invalide.is_set():
+            return False, "jeton invalide: cancel court-circuité", {}
+        url = f"{self.base_url}/api/subscriptions/{subscription_id}/cancel"
+        derniere_erreur: Optional[str] = None
+        for tentative in range(RETRY_TOTAL + 1):
+            if tentative:
+                await asyncio.sleep(RETRY_BACKOFF * (2 ** (tentative - 1)))
+            try:
+                async with session.post(url) as response:
+                    if response.status in RETRY_STATUSES:
+                        derniere_erreur = f"HTTP {response.status}"
+                        continue
+                    if response.status >= 400:
+                        if response.status == 401:
+                            self._auth_invalide.set()
+                        corps = (await response.read())[:512].decode(
+                            "utf-8", "replace"
+                        )
+                        return False, f"HTTP {response.status}: {corps}", {}
+                    return True, None, _json_loads(await response.read())
+            except asyncio.TimeoutError:
+                derniere_erreur = "timeout"
+            except aiohttp.ClientError as e:
+                derniere_erreur = str(e)
+        return False, derniere_erreur, {}
+
+    async def decommission_subscription_httpx(
+        self, client, subscription_id: str
+    ) -> Tuple[bool, Optional[str], Dict[str, Any]]:
+        """Variante httpx (HTTP/2): mêmes retours, même politique de retry."""
+        if self._auth_invalide.is_set():
+            return False, "jeton invalide: cancel court-circuité", {}
+        url = f"{self.base_url}/api/subscriptions/{subscription_id}/cancel"
+        derniere_erreur: Optional[str] = None
+        for tentative in range(RETRY_TOTAL + 1):
+            if tentative:
+                await asyncio.sleep(RETRY_BACKOFF * (2 ** (tentative - 1)))
+            try:
+                response = await client.post(url)
+            except httpx.HTTPError as e:
+                derniere_erreur = str(e)
+                continue
+            if response.status_code in RETRY_STATUSES:
+                derniere_erreur = f"HTTP {response.status_code}"
+                continue
+            if response.status_code >= 400:
+                if response.status_code == 401:
+                    self._auth_invalide.set()
+                corps = response.content[:512].decode("utf-8", "replace")
+                return False, f"HTTP {response.status_code}: {corps}", {}
+            return True, None, _json_loads(response.content)
+        return False, derniere_erreur, {}
+
+
+class _DryRunClient:
+    """Client factice du mode dry-run.
+
+    Présente la même surface que :class:`PSSITClient` sans importer ni
+    toucher la pile réseau: aucun appel n'est émis.
+    """
+
+    token = "dry-run"
+    verify_ssl = True
+    timeout = 30
+
+    def authenticate(self) -> bool:
+        return True
+
+    def decommission_subscription(
+        self, subscription_id: str
+    ) -> Tuple[bool, Optional[str], Dict[str, Any]]:
+        return True, None, {"dry_run": True}
+
+
+class VMDecommissioner:
+    """Orchestre le décommissionnement parallèle d'un lot de VMs."""
+
+    def __init__(self, client: PSSITClient, max_workers: int = 5,
+                 dry_run: bool = False, dry_run_delay: float = 0.0):
+        self.client = client
+        self.max_workers = max_workers
+        self.dry_run = dry_run
+        self.dry_run_delay = dry_run_delay
+        self.batch_start: Optional[datetime] = None
+
+    def iter_csv(self, csv_path: Path) -> Iterator[VMDecommissionRequest]:
+        """Itère sur le CSV des VMs, une demande validée à la fois.
+
+        Le premier décommissionnement peut partir dès la ligne 2 lue,
+        sans attendre la fin du parsing ni matérialiser tout le fichier.
+        """
+        with open(csv_path, newline="", encoding="utf-8") as csvfile:
+            # csv.reader + indices précalculés: pas de dict alloué par
+            # ligne ni de résolution d'en-tête répétée (DictReader).
+            reader = csv.reader(csvfile)
+            entete = next(reader, [])
+            champs = {"vm_name", "subscription_id", "vcenter", "environment"}
+            if not champs.issubset(entete):
+                raise ValueError(
+                    f"Colonnes manquantes dans {csv_path}: "
+                    f"{sorted(champs - set(entete))}"
+                )
+            i_vm = entete.index("vm_name")
+            i_sub = entete.index("subscription_id")
+            i_vc = entete.index("vcenter")
+            i_env = entete.index("environment")
+            requis = max(i_vm, i_sub, i_vc, i_env) + 1
+            for index, ligne in enumerate(reader, start=2):
+                # Lignes vides (csv.reader les rend comme []) et lignes
+                # tronquées: mêmes égards que DictReader avant l'accès
+                # positionnel.
+                if not ligne:
+                    continue
+                if len(ligne) < requis:
+                    logger.warning(
+                        "Ligne %d ignorée: colonnes manquantes", index
+                    )
+                    continue
+                vm_name = ligne[i_vm].strip()
+                subscription_id = ligne[i_sub].strip()
+                if not vm_name or not subscription_id:
+                    logger.warning(
+                        "Ligne %d ignorée: vm_name/subscription_id vide",
+                        index,
+                    )
+                    continue
+                yield VMDecommissionRequest(
+                    vm_name=vm_name,
+                    subscription_id=subscription_id,
+                    vcenter=ligne[i_vc].strip(),
+                    environment=ligne[i_env].strip(),
+                )
+
+    def load_csv(self, csv_path: Path) -> List[VMDecommissionRequest]:
+        """Charge tout le CSV en liste (pour les appelants non streaming)."""
+        demandes = list(self.iter_csv(csv_path))
+        logger.info("%d VM(s) à décommissionner", len(demandes))
+        return demandes
+
+    def decommission_vm(
+        self, request: VMDecommissionRequest
+    ) -> DecommissionResult:
+        """Décommissionne une VM (chemin synchrone)."""
+        request.status = DecommissionStatus.IN_PROGRESS
+        t0 = time.monotonic()
+        request.start_time = t0
+        logger.info(
+            "Décommissionnement de %s (subscription: %s)...",
+            request.vm_name, request.subscription_id,
+        )
+
+        if self.dry_run:
+            if self.dry_run_delay:
+                time.sleep(self.dry_run_delay)
+            request.status = DecommissionStatus.SUCCESS
+            request.end_time = time.monotonic()
+            return DecommissionResult(
+                vm_name=request.vm_name,
+                subscription_id=request.subscription_id,
+                status=DecommissionStatus.SUCCESS,
+                duration=request.end_time - t0,
+                details={"dry_run": True},
+            )
+
+        success, error, details = self.client.decommission_subscription(
+            request.subscription_id
+        )
+        request.end_time = time.monotonic()
+        request.status = (
+            DecommissionStatus.SUCCESS if success else DecommissionStatus.FAILED
+        )
+        request.error_message = error
+        return DecommissionResult(
+            vm_name=request.vm_name,
+            subscription_id=request.subscription_id,
+            status=request.status,
+            duration=request.end_time - t0,
+            error_message=error,
+            details=details,
+        )
+
+    async def _decommission_vm_async(
+        self, annuler, semaphore: asyncio.Semaphore,
+        request: VMDecommissionRequest,
+    ) -> DecommissionResult:
+        """Décommissionne une VM sous le sémaphore de concurrence.
+
+        ``annuler`` est la coroutine d'annulation du backend HTTP choisi
+        (aiohttp ou httpx), déjà liée à sa session.
+        """
+        async with semaphore:
+            request.status = DecommissionStatus.IN_PROGRESS
+            t0 = time.monotonic()
+            request.start_time = t0
+            logger.info(
+                "Décommissionnement de %s (subscription: %s)...",
+                request.vm_name, request.subscription_id,
+            )
+
+            if self.dry_run:
+                if self.dry_run_delay:
+                    await asyncio.sleep(self.dry_run_delay)
+                success, error, details = True, None, {"dry_run": True}
+            else:
+                success, error, details = await annuler(
+                    request.subscription_id
+                )
+            request.end_time = time.monotonic()
+            request.status = (
+                DecommissionStatus.SUCCESS if success
+                else DecommissionStatus.FAILED
+            )
+            request.error_message = error
+            return DecommissionResult(
+                vm_name=request.vm_name,
+                subscription_id=request.subscription_id,
+                status=request.status,
+                duration=request.end_time - t0,
+                error_message=error,
+                details=details,
+            )
+
+    def _faire_suivi(self, total: Optional[int]):
+        """Compteurs incrémentaux de progression, journalisés par paliers.
+
+        Évite de recompter les succès/échecs à chaque complétion (O(N²)
+        sur le lot) et ne journalise qu'environ une ligne par pourcent.
+        """
+        fait = succes = echecs = 0
+        pas = max(1, total // 100) if total else 100
+
+        def suivre(result: DecommissionResult) -> None:
+            nonlocal fait, succes, echecs
+            fait += 1
+            if result.status == DecommissionStatus.SUCCESS:
+                succes += 1
+            elif result.status == DecommissionStatus.FAILED:
+                echecs += 1
+            if fait % pas == 0 or fait == total:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "Progression: %s/%s (%d succès, %d échecs)",
+                        fait, total if total is not None else "?",
+                        succes, echecs,
+                    )
+
+        return suivre
+
+    async def _collecter_async(
+        self, annuler, requests_iter: Iterable[VMDecommissionRequest]
+    ) -> List[DecommissionResult]:
+        """Lance toutes les annulations et collecte au fil des complétions."""
+        semaphore = asyncio.Semaphore(self.max_workers)
+        taches = [
+            asyncio.ensure_future(
+                self._decommission_vm_async(annuler, semaphore, demande)
+            )
+            for demande in requests_iter
+        ]
+        results: List[DecommissionResult] = []
+        suivre = self._faire_suivi(len(taches))
+        for tache in asyncio.as_completed(taches):
+            result = await tache
+            results.append(result)
+            suivre(result)
+        return results
+
+    async def _run_batch_aiohttp(
+        self, requests_iter: Iterable[VMDecommissionRequest]
+    ) -> List[DecommissionResult]:
+        """Fan-out aiohttp: un seul thread porte tous les cancels en vol."""
+        # DNS résolu une fois pour tout le lot, et un seul contexte TLS
+        # partagé: N workers ne paient qu'un getaddrinfo et profitent de
+        # la reprise de session au lieu de N handshakes complets.
+        connector = aiohttp.TCPConnector(
+            limit=self.max_workers,
+            limit_per_host=self.max_workers,
+            ssl=_SSL_CTX if self.client.verify_ssl else False,
+            keepalive_timeout=75,
+            use_dns_cache=True,
+            ttl_dns_cache=600,
+        )
+        timeout = aiohttp.ClientTimeout(total=self.client.timeout)
+        headers = {"Authorization": f"Bearer {self.client.token}"}
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout, headers=headers
+        ) as session:
+            annuler = partial(
+                self.client.decommission_subscription_async, session
+            )
+            return await self._collecter_async(annuler, requests_iter)
+
+    async def _run_batch_httpx(
+        self, requests_iter: Iterable[VMDecommissionRequest]
+    ) -> List[DecommissionResult]:
+        """Fan-out httpx: tous les cancels multiplexés en HTTP/2.
+
+        En HTTP/2 les cancels voyagent en flux concurrents sur une ou
+        deux connexions; le plafond reste à max_workers pour que le
+        fan-out survive à un serveur qui ne négocie que HTTP/1.1.
+        """
+        limits = httpx.Limits(
+            max_connections=self.max_workers,
+            max_keepalive_connections=self.max_workers,
+        )
+        async with httpx.AsyncClient(
+            http2=True,
+            limits=limits,
+            timeout=self.client.timeout,
+            verify=_SSL_CTX if self.client.verify_ssl else False,
+            headers={
+                "Authorization": f"Bearer {self.client.token}",
+                "Content-Type": "application/json",
+            },
+        ) as client:
+            annuler = partial(
+                self.client.decommission_subscription_httpx, client
+            )
+            return await self._collecter_async(annuler, requests_iter)
+
+    def _run_batch_threads(
+        self, requests_iter: Iterable[VMDecommissionRequest]
+    ) -> List[DecommissionResult]:
+        """Fan-out sur threads (sans aiohttp), avec soumission bornée.
+
+        Au plus 2*max_workers futures vivent à la fois: le CSV peut donc
+        être consommé en flux sans pré-soumettre des millions de lignes.
+        """
+        results: List[DecommissionResult] = []
+        total = len(requests_iter) if hasattr(requests_iter, "__len__") else None
+        en_vol: set = set()
+        fenetre = 2 * self.max_workers
+        suivre = self._faire_suivi(total)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for demande in requests_iter:
+                en_vol.add(executor.submit(self.decommission_vm, demande))
+                if len(en_vol) >= fenetre:
+                    terminees, en_vol = futures_wait(
+                        en_vol, return_when=FIRST_COMPLETED
+                    )
+                    for future in terminees:
+                        result = future.result()
+                        results.append(result)
+                        suivre(result)
+            for future in as_completed(en_vol):
+                result = future.result()
+                results.append(result)
+                suivre(result)
+        return results
+
+    def decommission_batch(
+        self, requests_iter: Iterable[VMDecommissionRequest]
+    ) -> List[DecommissionResult]:
+        """Décommissionne tout le lot avec au plus max_workers en vol.
+
+        Accepte une liste ou un itérable paresseux (voir :meth:`iter_csv`):
+        le premier cancel part pendant que la suite du CSV se lit encore.
+        httpx est préféré quand il est installé (multiplexage HTTP/2 sur
+        une seule connexion), puis aiohttp (un socket par worker), et en
+        dernier recours le pool de threads d'origine sur requests.
+        """
+        self.batch_start = datetime.now()
+        logger.info(
+            "Lancement du lot: %d workers%s",
+            self.max_workers, " [DRY-RUN]" if self.dry_run else "",
+        )
+        if self.dry_run:
+            # Le stub dry-run n'expose que le chemin synchrone et ne doit
+            # importer aucune pile réseau: toujours le pool de threads.
+            return self._run_batch_threads(requests_iter)
+        _charger_backends_async()
+        if httpx is not None:
+            return asyncio.run(self._run_batch_httpx(requests_iter))
+        if aiohttp is not None:
+            return asyncio.run(self._run_batch_aiohttp(requests_iter))
+        return self._run_batch_threads(requests_iter)
+
+    def generate_report(self, results: List[DecommissionResult],
+                        output_path: Optional[Path] = None) -> str:
+        """Écrit le rapport complet en flux et retourne un aperçu console.
+
+        Le détail par VM est écrit ligne à ligne dans ``output_path``
+        (tampon de 1 Mio) au lieu d'assembler une chaîne géante en
+        mémoire; l'aperçu retourné ne contient que l'en-tête, la
+        synthèse et les derniers échecs.
+        """
+        echecs = [r for r in results
+                  if r.status == DecommissionStatus.FAILED]
+        lance = self.batch_start or datetime.now()
+        entete = [
+            "=" * 70,
+            "RAPPORT DE DÉCOMMISSIONNEMENT",
+            f"Lot lancé le: {lance.strftime('%Y-%m-%d %H:%M:%S')}",
+            "=" * 70,
+            "",
+            f"Total: {len(results)}",
+            f"Succès: {sum(1 for r in results if r.status == DecommissionStatus.SUCCESS)}",
+            f"Échecs: {len(echecs)}",
+            "",
+        ]
+
+        if output_path is not None:
+            with output_path.open("w", encoding="utf-8",
+                                  buffering=1 << 20) as rapport:
+                rapport.write("\n".join(entete))
+                rapport.write("\n")
+                for result in results:
+                    rapport.write(
+                        f"{result.vm_name} ({result.subscription_id}): "
+                        f"{result.status.value} en {result.duration:.2f}s\n"
+                    )
+                    if result.error_message:
+                        rapport.write(
+                            f"   Erreur: {result.error_message}\n"
+                        )
+            logger.info("Rapport écrit dans %s", output_path)
+
+        apercu = list(entete)
+        derniers = echecs[-_APERCU_ECHECS:]
+        if derniers:
+            apercu.append(
+                f"Derniers échecs ({len(derniers)}/{len(echecs)}):"
+            )
+            for result in derniers:
+                apercu.append(
+                    f"  {result.vm_name} ({result.subscription_id}): "
+                    f"{result.error_message}"
+                )
+        return "\n".join(apercu)
+
+    def export_results_csv(self, results: List[DecommissionResult],
+                           output_path: Path) -> None:
+        """Exporte les résultats en CSV (pyarrow si disponible)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pacsv
+        except ImportError:
+            pa = None
+        if pa is not None:
+            # Sérialisation colonnaire vectorisée, nettement plus rapide
+            # que csv.writer au-delà de ~100k lignes.
+            table = pa.table({
+                "vm_name": [r.vm_name for r in results],
+                "subscription_id": [r.subscription_id for r in results],
+                "status": [r.status.value for r in results],
+                "duration": [f"{r.duration:.2f}" for r in results],
+                "error_message": [r.error_message or "" for r in results],
+            })
+            pacsv.write_csv(table, str(output_path))
+        else:
+            with open(output_path, "w", newline="",
+                      encoding="utf-8") as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow((
+                    "vm_name", "subscription_id", "status", "duration",
+                    "error_message",
+                ))
+                writer.writerows(
+                    (r.vm_name, r.subscription_id, r.status.value,
+                     f"{r.duration:.2f}", r.error_message or "")
+                    for r in results
+                )
+        logger.info("Résultats exportés dans %s", output_path)
+
+
+def setup_logging(verbose: bool, log_file: Optional[str]) -> QueueListener:
+    """Configure la journalisation via une file asynchrone.
+
+    Les workers n'attachent qu'un QueueHandler: ils déposent l'enregistrement
+    et repartent, sans jamais prendre le verrou d'E/S du fichier ni de la
+    console; un QueueListener unique formate et écrit en arrière-plan.
+    L'appelant doit arrêter le listener retourné en fin d'exécution.
+    """
+    cibles: List[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        cibles.append(logging.FileHandler(log_file, encoding="utf-8"))
+    formateur = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    for handler in cibles:
+        handler.setFormatter(formateur)
+    file_attente: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(file_attente, *cibles,
+                             respect_handler_level=True)
+    listener.start()
+    racine = logging.getLogger()
+    racine.setLevel(logging.DEBUG if verbose else logging.INFO)
+    racine.addHandler(QueueHandler(file_attente))
+    return listener
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Décommissionnement en masse de VMs via PSSIT"
+    )
+    parser.add_argument("csv_file", help="CSV des VMs à décommissionner")
+    parser.add_argument("--url", required=True, help="URL de base PSSIT")
+    parser.add_argument("--username", required=True,
+                        help="Compte de service PSSIT")
+    parser.add_argument("--password",
+                        help="Mot de passe (demandé si absent)")
+    parser.add_argument("--workers", type=int, default=5,
+                        help="Nombre de décommissionnements parallèles")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Simule sans appeler l'API d'annulation")
+    parser.add_argument("--dry-run-delay", type=float, default=0.0,
+                        help="Latence simulée par VM en dry-run (secondes)")
+    parser.add_argument("--report", help="Fichier du rapport texte")
+    parser.add_argument("--results-csv", help="CSV des résultats")
+    parser.add_argument("--no-verify-ssl", action="store_true",
+                        help="Désactive la vérification SSL")
+    parser.add_argument("--log-file", help="Fichier de log")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Logs détaillés")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    listener = setup_logging(args.verbose, args.log_file)
+    try:
+        if args.dry_run:
+            client = _DryRunClient()
+        else:
+            password = args.password or getpass.getpass(
+                "Mot de passe PSSIT: "
+            )
+            client = PSSITClient(
+                args.url, args.username, password,
+                verify_ssl=not args.no_verify_ssl,
+                pool_size=args.workers,
+            )
+            if not client.authenticate():
+                return 2
+
+        decommissioner = VMDecommissioner(
+            client, max_workers=args.workers, dry_run=args.dry_run,
+            dry_run_delay=args.dry_run_delay,
+        )
+        try:
+            results = decommissioner.decommission_batch(
+                decommissioner.iter_csv(Path(args.csv_file))
+            )
+        except (OSError, ValueError) as e:
+            logger.error("Lecture du CSV impossible: %s", e)
+            return 1
+        if not results:
+            logger.warning("Aucune VM à décommissionner")
+            return 0
+
+        apercu = decommissioner.generate_report(
+            results, Path(args.report) if args.report else None
+        )
+        print(apercu)
+        if args.results_csv:
+            decommissioner.export_results_csv(results, Path(args.results_csv))
+
+        echecs = sum(
+            1 for r in results if r.status == DecommissionStatus.FAILED
+        )
+        return 1 if echecs else 0
+    finally:
+        listener.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""Surveillance de l'état des VMs d'un vCenter via l'API REST.
+
+Interroge l'API vCenter pour chaque VM, détecte les problèmes (CPU,
+mémoire, échec de démarrage) et produit un rapport texte et/ou un export
+JSON exploitable par l'outillage en aval.
+
+Usage:
+    python vm_monitor.py --vcenter vcenter.example.com -u admin -p secret \
+        --output rapport.txt --json-output rapport.json
+"""
+
+import argparse
+import getpass
+import json
+import logging
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional
+
+import requests
+import urllib3
+from enum import Enum
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Encodeurs stdlib instanciés une seule fois: json.dumps reconstruit un
+# JSONEncoder (et re-valide ses kwargs) à chaque appel.
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_JSON_ENCODER_PRETTY = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+logger = logging.getLogger("vm_monitor")
+
+
+class VMIssueType(Enum):
+    """Types de problèmes détectables sur une VM."""
+
+    CPU_HIGH = "cpu_eleve"
+    MEMORY_HIGH = "memoire_elevee"
+    BOOT_FAILURE = "echec_demarrage"
+    TOOLS_NOT_RUNNING = "vmware_tools_arretes"
+
+
+# Valeurs des membres figées au chargement du module: .value passe par le
+# protocole descripteur de l'Enum à chaque lecture, autant le payer une
+# seule fois.
+_ISSUE_VALUES = {m: m.value for m in VMIssueType}
+
+# Membres chauds de l'enum figés au chargement: l'accès à l'attribut de
+# classe repasse par le métaclasse Enum à chaque lecture.
+_CPU_HIGH = VMIssueType.CPU_HIGH
+_MEM_HIGH = VMIssueType.MEMORY_HIGH
+_BOOT_FAIL = VMIssueType.BOOT_FAILURE
+
+
+@dataclass
+class VMStatus:
+    """État instantané d'une VM avec ses métriques et problèmes détectés."""
+
+    vm_name: str
+    vm_id: str
+    power_state: str
+    cpu_usage_percent: float = 0.0
+    cpu_usage_mhz: float = 0.0
+    cpu_limit_mhz: float = 0.0
+    memory_usage_percent: float = 0.0
+    memory_usage_mb: float = 0.0
+    memory_limit_mb: float = 0.0
+    memory_active_mb: float = 0.0
+    memory_consumed_mb: float = 0.0
+    # frozenset plutôt que liste: les tests d'appartenance en aval sont
+    # des sondes de hachage O(1) au lieu de parcours linéaires.
+    issues: FrozenSet[VMIssueType] = frozenset()
+
+
+class VCenterClient:
+    """Client minimal pour l'API REST vCenter (vSphere Automation)."""
+
+    def __init__(self, host: str, username: str, password: str,
+                 verify_ssl: bool = True, timeout: int = 30):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.base_url = f"https://{host}"
+        self.session = requests.Session()
+        self.session.verify = verify_ssl
+        self.session_id: Optional[str] = None
+        if not verify_ssl:
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    def connect(self) -> bool:
+        """Ouvre une session API et mémorise le jeton de session."""
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/session",
+                auth=(self.username, self.password),
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"❌ Connexion à {self.host} impossible: {e}")
+            return False
+        self.session_id = response.json()
+        self.session.headers["vmware-api-session-id"] = self.session_id
+        logger.info(f"✅ Connecté à {self.host}")
+        return True
+
+    def disconnect(self) -> bool:
+        """Ferme la session API côté vCenter. Ne lève jamais."""
+        if not self.session_id:
+            return True
+        try:
+            self.session.delete(
+                f"{self.base_url}/api/session", timeout=self.timeout
+            )
+        except (requests.exceptions.RequestException, OSError) as e:
+            logger.warning("⚠️ Échec de la déconnexion: %s", e)
+            return False
+        self.session_id = None
+        logger.info("🔌 Session vCenter fermée")
+        return True
+
+    def list_vms(self) -> List[Dict[str, Any]]:
+        """Retourne le résumé de toutes les VMs du vCenter."""
+        response = self.session.get(
+            f"{self.base_url}/api/vcenter/vm", timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def get_vm_stats(self, vm_id: str) -> Dict[str, Any]:
+        """Retourne les métriques détaillées d'une VM."""
+        response = self.session.get(
+            f"{self.base_url}/api/vcenter/vm/{vm_id}", timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+class VMMonitor:
+    """Analyse les VMs et détecte les dépassements de seuils."""
+
+    def __init__(self, client: VCenterClient,
+                 cpu_threshold: float = 80.0,
+                 memory_threshold: float = 85.0):
+        self.client = client
+        self.cpu_threshold = cpu_threshold
+        self.memory_threshold = memory_threshold
+
+    def monitor_vm(self, vm_summary: Dict[str, Any]) -> VMStatus:
+        """Construit le VMStatus d'une VM à partir de son résumé API."""
+        vm_id = vm_summary["vm"]
+        power_state = vm_summary.get("power_state", "UNKNOWN")
+        status = VMStatus(
+            vm_name=vm_summary.get("name", vm_id),
+            vm_id=vm_id,
+            power_state=power_state,
+        )
+
+        issues = []
+        if power_state != "POWERED_ON":
+            if power_state == "POWERED_OFF":
+                issues.append(VMIssueType.BOOT_FAILURE)
+            status.issues = frozenset(issues)
+            return status
+
+        stats = self.client.get_vm_stats(vm_id)
+        cpu = stats.get("cpu", {})
+        memory = stats.get("memory", {})
+
+        status.cpu_usage_mhz = float(cpu.get("usage_mhz", 0))
+        status.cpu_limit_mhz = float(cpu.get("limit_mhz", 0))
+        if status.cpu_limit_mhz > 0:
+            status.cpu_usage_percent = (
+                100.0 * status.cpu_usage_mhz / status.cpu_limit_mhz
+            )
+
+        status.memory_usage_mb = float(memory.get("usage_mb", 0))
+        status.memory_limit_mb = float(memory.get("size_mb", 0))
+        status.memory_active_mb = float(memory.get("active_mb", 0))
+        status.memory_consumed_mb = float(memory.get("consumed_mb", 0))
+        if status.memory_limit_mb > 0:
+            status.memory_usage_percent = (
+                100.0 * status.memory_usage_mb / status.memory_limit_mb
+            )
+
+        if status.cpu_usage_percent > self.cpu_threshold:
+            issues.append(VMIssueType.CPU_HIGH)
+        if status.memory_usage_percent > self.memory_threshold:
+            issues.append(VMIssueType.MEMORY_HIGH)
+        if stats.get("tools_status") == "NOT_RUNNING":
+            issues.append(VMIssueType.TOOLS_NOT_RUNNING)
+        status.issues = frozenset(issues)
+        return status
+
+    def monitor_all_vms(self) -> List[VMStatus]:
+        """Analyse toutes les VMs et retourne leurs états."""
+        vms = self.client.list_vms()
+        logger.info(f"🔍 Analyse de {len(vms)} VMs...")
+        statuses = []
+        for vm_summary in vms:
+            try:
+                statuses.append(self.monitor_vm(vm_summary))
+            except requests.exceptions.RequestException as e:
+                logger.warning(
+                    f"⚠️ Métriques indisponibles pour "
+                    f"{vm_summary.get('name', '?')}: {e}"
+                )
+        return statuses
+
+    def generate_report(self, vm_statuses: List[VMStatus]) -> str:
+        """Génère le rapport texte de l'analyse."""
+        # Liste de fragments puis join unique: la concaténation += sur
+        # str est quadratique sur les gros inventaires.
+        parts: List[str] = []
+        append = parts.append
+        append("=" * 70 + "\n")
+        append("RAPPORT DE SURVEILLANCE DES VMS\n")
+        append(f"Généré le: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        append(f"vCenter: {self.client.host}\n")
+        append("=" * 70 + "\n\n")
+
+        vms_with_issues = [vm for vm in vm_statuses if vm.issues]
+        append(f"VMs analysées: {len(vm_statuses)}\n")
+        append(f"VMs avec problèmes: {len(vms_with_issues)}\n\n")
+
+        # Alias local du built-in: évite la résolution du nom global à
+        # chacun des 6 arrondis par VM.
+        _round = round
+        for vm in vm_statuses:
+            append(f"VM: {vm.vm_name} ({vm.power_state})\n")
+            append(
+                f"  CPU: {_round(vm.cpu_usage_percent, 2)}% "
+                f"({_round(vm.cpu_usage_mhz, 2)}/{_round(vm.cpu_limit_mhz, 2)} MHz)\n"
+            )
+            append(
+                f"  Mémoire: {_round(vm.memory_usage_percent, 2)}% "
+                f"({_round(vm.memory_usage_mb, 2)}/{_round(vm.memory_limit_mb, 2)} MB)\n"
+            )
+            if vm.issues:
+                append(
+                    "  ⚠️ Problèmes: "
+                    + ", ".join(_ISSUE_VALUES[i] for i in vm.issues)
+                    + "\n"
+                )
+            append("\n")
+        return "".join(parts)
+
+
+def _vm_to_json_dict(vm: VMStatus) -> Dict[str, Any]:
+    """Construit le dictionnaire JSON d'une VM.
+
+    Fonction libre (et non méthode) pour rester picklable et donc
+    utilisable par un pool de processus sur les très gros inventaires.
+    """
+    _issues = vm.issues
+    return {
+        "name": vm.vm_name,
+        "id": vm.vm_id,
+        "power_state": vm.power_state,
+        # Pas d'arrondi côté JSON: 8 appels round() par VM ne servaient
+        # qu'à l'affichage, et l'encodeur formate les floats bien plus
+        # vite qu'un round() interprété par valeur.
+        "cpu": {
+            "usage_percent": vm.cpu_usage_percent,
+            "usage_mhz": vm.cpu_usage_mhz,
+            "limit_mhz": vm.cpu_limit_mhz,
+            "high": _CPU_HIGH in _issues,
+        },
+        "memory": {
+            "usage_percent": vm.memory_usage_percent,
+            "usage_mb": vm.memory_usage_mb,
+            "limit_mb": vm.memory_limit_mb,
+            "active_mb": vm.memory_active_mb,
+            "consumed_mb": vm.memory_consumed_mb,
+            "high": _MEM_HIGH in _issues,
+        },
+        "boot_failure": _BOOT_FAIL in _issues,
+        "issues": [_ISSUE_VALUES[i] for i in _issues],
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Surveillance des VMs d'un vCenter"
+    )
+    parser.add_argument("--vcenter", required=True,
+                        help="Nom d'hôte du vCenter")
+    parser.add_argument("-u", "--username", required=True,
+                        help="Utilisateur vCenter")
+    parser.add_argument("-p", "--password",
+                        help="Mot de passe (demandé si absent)")
+    parser.add_argument("--cpu-threshold", type=float, default=80.0,
+                        help="Seuil d'alerte CPU en %% (défaut: 80)")
+    parser.add_argument("--memory-threshold", type=float, default=85.0,
+                        help="Seuil d'alerte mémoire en %% (défaut: 85)")
+    parser.add_argument("--output", help="Fichier de sortie du rapport texte")
+    parser.add_argument("--json-output", help="Fichier de sortie JSON")
+    parser.add_argument("--json-pretty", action="store_true",
+                        help="Indente le JSON (plus lent; jq fait aussi bien)")
+    parser.add_argument("--no-verify-ssl", action="store_true",
+                        help="Désactive la vérification SSL")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Logs détaillés")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    password = args.password or getpass.getpass("Mot de passe vCenter: ")
+
+    api_client = VCenterClient(
+        args.vcenter, args.username, password,
+        verify_ssl=not args.no_verify_ssl,
+    )
+    exit_code = 0
+    try:
+        if not api_client.connect():
+            return 3
+
+        monitor = VMMonitor(
+            api_client,
+            cpu_threshold=args.cpu_threshold,
+            memory_threshold=args.memory_threshold,
+        )
+        vm_statuses = monitor.monitor_all_vms()
+        vms_with_issues = [vm for vm in vm_statuses if vm.issues]
+
+        # Passe unique sur les VMs: fige les valeurs sérialisées des
+        # problèmes et les VMs critiques en un seul parcours, au lieu de
+        # re-balayer vm_statuses (et vm.issues) plus loin.
+        vm_issue_values = {}
+        critical_issues = []
+        for vm in vm_statuses:
+            _issues = vm.issues
+            vm_issue_values[vm.vm_id] = [_ISSUE_VALUES[i] for i in _issues]
+            if _BOOT_FAIL in _issues or vm.power_state == "POWERED_OFF":
+                critical_issues.append(vm)
+
+        report = monitor.generate_report(vm_statuses)
+        # writelines plutôt que print("\n" + report): la concaténation
+        # dupliquerait tout le rapport en mémoire juste pour un saut de
+        # ligne.
+        sys.stdout.writelines(["\n", report])
+        sys.stdout.flush()
+
+        def _write_text_report():
+            # Encodage UTF-8 en un seul appel puis écriture binaire sans
+            # tampon: un memcpy et un syscall au lieu du TextIOWrapper
+            # qui encode incrémentalement. os.replace garantit qu'un
+            # rapport tronqué ne remplace jamais le précédent.
+            data = report.encode("utf-8")
+            tmp = args.output + ".tmp"
+            with open(tmp, "wb", buffering=0) as f:
+                f.write(data)
+            os.replace(tmp, args.output)
+            logger.info(f"📄 Rapport écrit dans {args.output}")
+
+        def _write_json_export():
+            # Ouverture du fichier avant tout calcul: si la destination
+            # est inécrivable (droits, disque plein), on échoue tout de
+            # suite au lieu de sérialiser pour rien.
+            tmp = args.json_output + ".tmp"
+            f = open(tmp, "wb")
+            # Lectures d'attributs hissées en locales: le Namespace
+            # d'argparse passe par __getattribute__ à chaque accès.
+            _ts = datetime.now().isoformat()
+            _vc = args.vcenter
+            _cpu_t = args.cpu_threshold
+            _mem_t = args.memory_threshold
+            metadata = {
+                "generated_at": _ts,
+                "vcenter": _vc,
+                "cpu_threshold": _cpu_t,
+                "memory_threshold": _mem_t,
+            }
+            issues_by_type = Counter()
+            for vm in vms_with_issues:
+                issues_by_type.update(vm_issue_values[vm.vm_id])
+
+            statistics = {
+                "total_vms": len(vm_statuses),
+                "powered_on": sum(
+                    1 for vm in vm_statuses
+                    if vm.power_state == "POWERED_ON"
+                ),
+                "powered_off": sum(
+                    1 for vm in vm_statuses
+                    if vm.power_state == "POWERED_OFF"
+                ),
+                "vms_with_issues": len(vms_with_issues),
+                "issues_by_type": dict(issues_by_type),
+            }
+
+            # L'encodeur compact est environ deux fois plus rapide que le
+            # mode indenté; l'indentation n'est utile qu'à un lecteur
+            # humain, d'où l'option explicite.
+            if orjson is not None:
+                if args.json_pretty:
+                    def _dumps(obj):
+                        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+                else:
+                    _dumps = orjson.dumps
+            else:
+                _encoder = (_JSON_ENCODER_PRETTY if args.json_pretty
+                            else _JSON_ENCODER)
+
+                def _dumps(obj, _encode=_encoder.encode):
+                    return _encode(obj).encode("utf-8")
+
+            # Écriture en flux: l'en-tête d'abord, puis les VMs une à une,
+            # pour ne jamais matérialiser la liste complète ni la chaîne
+            # sérialisée en mémoire.
+            with f:
+                f.write(b'{"metadata":')
+                f.write(_dumps(metadata))
+                f.write(b',"statistics":')
+                f.write(_dumps(statistics))
+                f.write(b',"vms":[')
+                # Au-delà de quelques milliers de VMs, la construction des
+                # dictionnaires (pur Python) vaut le coût du fork; en
+                # dessous, le pool coûterait plus qu'il ne rapporte.
+                if len(vm_statuses) > 2000:
+                    with ProcessPoolExecutor(
+                        max_workers=min(8, os.cpu_count() or 1)
+                    ) as ex:
+                        for i, vm_data in enumerate(
+                            ex.map(_vm_to_json_dict, vm_statuses,
+                                   chunksize=256)
+                        ):
+                            if i:
+                                f.write(b",")
+                            f.write(_dumps(vm_data))
+                else:
+                    for i, vm in enumerate(vm_statuses):
+                        if i:
+                            f.write(b",")
+                        f.write(_dumps(_vm_to_json_dict(vm)))
+                f.write(b"]}")
+            os.replace(tmp, args.json_output)
+            logger.info(f"📊 Export JSON écrit dans {args.json_output}")
+
+        # Les deux fichiers de sortie sont indépendants: les écrire en
+        # parallèle pendant que write() relâche le GIL ramène le temps
+        # d'attente à max(texte, JSON) au lieu de leur somme.
+        output_jobs = []
+        if args.output:
+            output_jobs.append(_write_text_report)
+        if args.json_output:
+            output_jobs.append(_write_json_export)
+        if output_jobs:
+            try:
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    futures = [pool.submit(job) for job in output_jobs]
+                    for future in futures:
+                        future.result()
+            except OSError as e:
+                logger.error("❌ Écriture des rapports impossible: %s", e)
+                return 3
+
+        if critical_issues:
+            # Formatage paresseux: logging ne construit le message que si
+            # le niveau est actif, et le garde-fou évite même la boucle.
+            if logger.isEnabledFor(logging.ERROR):
+                logger.error("🚨 %d VM(s) en état critique:",
+                             len(critical_issues))
+                for vm in critical_issues:
+                    logger.error("   - %s: %s", vm.vm_name,
+                                 vm_issue_values[vm.vm_id])
+            exit_code = 2
+        elif vms_with_issues:
+            exit_code = 1
+
+        logger.info(
+            "📈 Statistiques: %d VMs analysées, %d avec problèmes",
+            len(vm_statuses), len(vms_with_issues),
+        )
+    except requests.exceptions.RequestException as e:
+        logger.error(f"❌ Erreur API vCenter: {e}")
+        exit_code = 3
+    finally:
+        api_client.disconnect()
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())